@@ -137,14 +137,20 @@ def detect_bash_event(command: str, output: str) -> tuple[str, dict]:
 
         return "beads_created", metadata
 
-    # Test runner
-    if 'test_runner' in command or 'pytest' in command:
+    # Test runner (or engine compilation through the compile cache)
+    if 'test_runner' in command or 'pytest' in command or 'rac-compile-cache' in command:
         # Extract file path
         rac_match = re.search(r'(\S+\.rac)', command)
         if rac_match:
             metadata["file_path"] = rac_match.group(1)
 
         if output:
+            # Record how much compilation the cache skipped
+            cache_match = re.search(r'compile cache: (\d+) hits, (\d+) misses', output)
+            if cache_match:
+                metadata["cache_hits"] = int(cache_match.group(1))
+                metadata["cache_misses"] = int(cache_match.group(2))
+
             # Check for pass/fail
             if 'PASSED' in output or '✓' in output or 'passed' in output.lower():
                 # Count passed tests
@@ -192,7 +198,13 @@ def main():
 
     elif tool_name == "Bash":
         command = tool_input.get("command", "")
-        output = tool_response.get("output", "") if isinstance(tool_response, dict) else str(tool_response)
+        if isinstance(tool_response, dict):
+            # Bash responses carry stdout/stderr; older payloads used output
+            output = "\n".join(
+                part for part in (tool_response.get("stdout"), tool_response.get("stderr")) if part
+            ) or tool_response.get("output", "")
+        else:
+            output = str(tool_response)
         event_type, metadata = detect_bash_event(command, output)
         if metadata and "file_path" in metadata:
             file_path = metadata["file_path"]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Content-hash compile cache for `autorac compile`.
+
+Each .rac file is keyed by the SHA-256 of its path and content plus the keys
+of its resolved imports and amend targets (recursively) and the compiler's
+identity, so a file is recompiled only when it, one of its dependencies, or
+the compiler changed. Successful compile output is stored in local SQLite and
+evicted least-recently-used once the cache exceeds --max-bytes.
+
+Prints a `compile cache: N hits, M misses` summary that log-encoding-events.py
+records on the test_run event.
+
+Usage:
+    rac-compile-cache.py statute/26/1411            # every .rac under a directory
+    rac-compile-cache.py a.rac b.rac --as-of 2024-06-01
+    rac-compile-cache.py --clear
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shlex
+import shutil
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+CACHE_DB = Path(os.environ.get(
+    "RAC_COMPILE_CACHE_DB",
+    Path.home() / "RulesFoundation" / "autorac" / "compile_cache.db",
+))
+COMPILE_COMMAND = os.environ.get("RAC_COMPILE_COMMAND", "autorac compile")
+MAX_CACHE_BYTES = int(os.environ.get("RAC_COMPILE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Share the .rac parser with the symbol index
+_spec = importlib.util.spec_from_file_location(
+    "rac_index", Path(__file__).with_name("rac-index.py")
+)
+rac_index = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(rac_index)
+
+
+def init_cache(conn: sqlite3.Connection):
+    """Initialize cache schema."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS compile_cache (
+            key TEXT PRIMARY KEY,  -- content + import hashes + compile args
+            file_path TEXT NOT NULL,
+            output TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            last_used_at TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cache_last_used
+        ON compile_cache(last_used_at)
+    """)
+    conn.commit()
+
+
+def find_root(file_path: Path) -> Path:
+    """The rac-us checkout a file lives in (the ancestor holding `statute/`)."""
+    for parent in file_path.parents:
+        if parent.name == 'statute':
+            return parent.parent
+        if (parent / 'statute').is_dir():
+            return parent
+    return rac_index.RAC_US_ROOT
+
+
+def compiler_identity() -> str:
+    """Resolved compiler executable plus its mtime/size, so upgrades invalidate the cache."""
+    executable = shutil.which(shlex.split(COMPILE_COMMAND)[0])
+    if not executable:
+        return "missing"
+    executable = os.path.realpath(executable)
+    stat = os.stat(executable)
+    return f"{executable}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class KeyBuilder:
+    """Computes Merkle-style cache keys over the import graph, memoized per run."""
+
+    def __init__(self, extra: str = ""):
+        self.extra = extra
+        self.keys: dict[Path, str] = {}
+        self.visiting: set[Path] = set()
+
+    def key_for(self, file_path: Path) -> str:
+        file_path = file_path.resolve()
+        if file_path in self.keys:
+            return self.keys[file_path]
+
+        root = find_root(file_path)
+        digest = hashlib.sha256(self.extra.encode())
+        # Identical placeholder files must not share compiled output
+        rel_path = rac_index.relative_to_root(root, file_path) or str(file_path)
+        digest.update(b"path:" + rel_path.encode() + b"\0")
+        try:
+            content = file_path.read_bytes()
+        except FileNotFoundError:
+            # Missing imports still affect the result; key on their absence
+            digest.update(b"missing:" + str(file_path).encode())
+            return digest.hexdigest()
+        digest.update(hashlib.sha256(content).digest())
+
+        # Circular dependencies: a file reached again mid-cycle is hashed from
+        # its content only, so cycle members' keys miss some transitive deps.
+        # This is safe only because cyclic files fail compilation and are not
+        # stored; revisit if failures or warnings are ever cached.
+        if file_path not in self.visiting:
+            self.visiting.add(file_path)
+            parsed = rac_index.parse_rac(content.decode('utf-8', errors='replace'))
+            citations = sorted(
+                {citation for citation, _, _ in parsed["imports"]}
+                | {citation for citation, _ in parsed["amends"]}
+            )
+            for citation in citations:
+                dep = root / 'statute' / f"{citation}.rac"
+                digest.update(citation.encode() + b"=" + self.key_for(dep).encode())
+            self.visiting.discard(file_path)
+
+        key = digest.hexdigest()
+        self.keys[file_path] = key
+        return key
+
+
+def lookup(conn: sqlite3.Connection, key: str) -> str:
+    """Return cached output for key (and bump its LRU timestamp), or None."""
+    row = conn.execute("SELECT output FROM compile_cache WHERE key = ?", (key,)).fetchone()
+    if row:
+        conn.execute(
+            "UPDATE compile_cache SET last_used_at = ? WHERE key = ?",
+            (datetime.utcnow().isoformat(), key)
+        )
+    return row[0] if row else None
+
+
+def store(conn: sqlite3.Connection, key: str, file_path: Path, output: str):
+    """Insert a compile result."""
+    now = datetime.utcnow().isoformat()
+    conn.execute("""
+        INSERT OR REPLACE INTO compile_cache (key, file_path, output, size, created_at, last_used_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (key, str(file_path), output, len(output.encode()), now, now))
+
+
+def evict(conn: sqlite3.Connection, max_bytes: int) -> int:
+    """Drop least-recently-used entries until the cache fits in max_bytes."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM compile_cache").fetchone()[0]
+    evicted = 0
+    if total <= max_bytes:
+        return evicted
+    for key, size in conn.execute(
+        "SELECT key, size FROM compile_cache ORDER BY last_used_at"
+    ).fetchall():
+        conn.execute("DELETE FROM compile_cache WHERE key = ?", (key,))
+        total -= size
+        evicted += 1
+        if total <= max_bytes:
+            break
+    return evicted
+
+
+def compile_file(file_path: Path, extra_args: list[str]) -> tuple[int, str]:
+    """Run the real compiler on one file."""
+    cmd = shlex.split(COMPILE_COMMAND) + [str(file_path), "--json"] + extra_args
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError as e:
+        return 127, str(e)
+    return result.returncode, result.stdout if result.returncode == 0 else result.stdout + result.stderr
+
+
+def collect_files(paths: list[Path]) -> list[Path]:
+    """Expand directories to the .rac files they contain."""
+    files = []
+    for path in paths:
+        path = path.expanduser()
+        if path.is_dir():
+            files.extend(sorted(rac_index.iter_rac_files(path)))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile .rac files through a content-hash cache")
+    parser.add_argument("paths", nargs="*", type=Path, help=".rac files or directories")
+    parser.add_argument("--as-of", help="passed through to the compiler")
+    parser.add_argument("--json", action="store_true", help="JSON summary")
+    parser.add_argument("--max-bytes", type=int, default=MAX_CACHE_BYTES, help="cache size bound")
+    parser.add_argument("--clear", action="store_true", help="empty the cache")
+    args = parser.parse_args()
+
+    CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(CACHE_DB))
+    init_cache(conn)
+
+    if args.clear:
+        conn.execute("DELETE FROM compile_cache")
+        conn.commit()
+        conn.close()
+        print("compile cache cleared")
+        return
+
+    extra_args = ["--as-of", args.as_of] if args.as_of else []
+    keys = KeyBuilder(extra="\0".join([COMPILE_COMMAND, compiler_identity()] + extra_args))
+    results = []
+    hits = misses = failures = 0
+
+    for file_path in collect_files(args.paths):
+        key = keys.key_for(file_path)
+        output = lookup(conn, key)
+        if output is not None:
+            hits += 1
+            results.append({"file_path": str(file_path), "cached": True, "ok": True, "output": output})
+            continue
+
+        misses += 1
+        returncode, output = compile_file(file_path, extra_args)
+        # Only cache successes; failures may come from the environment
+        if returncode == 0:
+            store(conn, key, file_path, output)
+        else:
+            failures += 1
+        results.append({"file_path": str(file_path), "cached": False, "ok": returncode == 0, "output": output})
+        conn.commit()
+
+    evicted = evict(conn, args.max_bytes)
+    conn.commit()
+    conn.close()
+
+    summary = {"hits": hits, "misses": misses, "failures": failures, "evicted": evicted}
+    if args.json:
+        print(json.dumps({"summary": summary, "results": results}, indent=2))
+    else:
+        for result in results:
+            status = "cached" if result["cached"] else ("ok" if result["ok"] else "FAILED:")
+            print(f"{status}\t{result['file_path']}")
+            if not result["ok"]:
+                print(result["output"].rstrip())
+        print(f"compile cache: {hits} hits, {misses} misses, {failures} failed")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Persistent symbol index for the rac-us corpus.
+
+Tracks definition -> file, stub -> target citation, and file -> imports in
+local SQLite so agents can answer "which file defines X" or "which stubs are
+still blocking Y" without re-grepping the whole tree.
+
+Fires on PostToolUse for Write and Edit tools (`rac-index.py hook`, hook input
+on stdin) and re-indexes the touched .rac file from disk. The first query on a
+new index runs a full mtime scan; after that, changes made outside Write/Edit
+(git pull, mv, rm, generated files) are only picked up by `update` or by
+`--refresh` on a query.
+
+Usage:
+    rac-index.py hook
+    rac-index.py rebuild
+    rac-index.py update [FILE ...]
+    rac-index.py defines NAME
+    rac-index.py stubs [--for CITATION]
+    rac-index.py imports FILE
+    rac-index.py importers CITATION[#NAME]
+    rac-index.py blocking FILE
+    rac-index.py unresolved [FILE]
+
+Add --json for machine-readable output, --refresh to run the mtime scan first.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# One index DB per corpus root (rac_index_<hash>.db)
+INDEX_DIR = Path(os.environ.get(
+    "RAC_INDEX_DIR",
+    Path.home() / "RulesFoundation" / "autorac",
+))
+RAC_US_ROOT = Path(os.environ.get(
+    "RAC_US_ROOT",
+    Path.home() / "RulesFoundation" / "rac-us",
+))
+
+# `name:` at column 0, optionally after a declaration keyword, opens a
+# definition. Temporal entries (`from YYYY-MM-DD:`) and `amend path#name:`
+# never match.
+DEFINITION_RE = re.compile(
+    r'^(?:(?:input|parameter|variable)\s+)?([A-Za-z_]\w*):\s*(?:#.*)?$'
+)
+IMPORTS_BLOCK_RE = re.compile(r'^(\s*)imports:\s*(\[.*\])?\s*(?:#.*)?$')
+IMPORT_REF_RE = re.compile(r'["\']?([\w./-]+)#(\w+)(?:\s+as\s+(\w+))?')
+AMEND_RE = re.compile(r'^amend\s+["\']?([\w./-]+)#(\w+)["\']?\s*:')
+STATUS_RE = re.compile(r'^status:\s*(\w+)', re.MULTILINE)
+STUB_FOR_RE = re.compile(r'^(\s*)stub_for:\s*([^#]+)')
+
+# Bump when the schema changes; older index DBs are dropped and rebuilt
+SCHEMA_VERSION = "2"
+
+# File-level keys that look like definitions but are not
+RESERVED_KEYS = {"imports"}
+
+
+def init_index(conn: sqlite3.Connection):
+    """Initialize index schema, dropping tables from an older schema version."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is None or row[0] != SCHEMA_VERSION:
+        for table in ("files", "definitions", "imports"):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute("DELETE FROM meta")
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
+            (SCHEMA_VERSION,)
+        )
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,  -- relative to corpus root
+            citation TEXT NOT NULL,  -- e.g. 26/32/c/3/D/i
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            status TEXT,
+            indexed_at TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS definitions (
+            path TEXT NOT NULL,
+            name TEXT NOT NULL,
+            line INTEGER,
+            stub_for TEXT  -- citation this stub stands in for
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS imports (
+            path TEXT NOT NULL,
+            target_citation TEXT NOT NULL,
+            target_name TEXT NOT NULL,
+            alias TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_files_citation ON files(citation)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_files_status ON files(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_defs_name ON definitions(name)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_defs_path ON definitions(path)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_imports_path ON imports(path)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_imports_target ON imports(target_citation)")
+    conn.commit()
+
+
+def index_db_for(root: Path) -> Path:
+    """Index DB path for a corpus root, so checkouts never share an index."""
+    root_hash = hashlib.sha256(str(root.resolve()).encode()).hexdigest()[:12]
+    return INDEX_DIR / f"rac_index_{root_hash}.db"
+
+
+def connect(root: Path = RAC_US_ROOT) -> sqlite3.Connection:
+    """Open the index for `root`."""
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(index_db_for(root)))
+    init_index(conn)
+    conn.execute(
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('root', ?)",
+        (str(root.resolve()),)
+    )
+    conn.commit()
+    return conn
+
+
+def relative_to_root(root: Path, file_path: Path) -> str:
+    """Corpus-relative posix path, or None if file_path is outside root."""
+    try:
+        return file_path.resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def clear_index(conn: sqlite3.Connection):
+    """Drop all indexed rows (schema is kept)."""
+    conn.execute("DELETE FROM files")
+    conn.execute("DELETE FROM definitions")
+    conn.execute("DELETE FROM imports")
+    conn.execute("DELETE FROM meta WHERE key = 'last_full_scan'")
+
+
+def citation_for(rel_path: str) -> str:
+    """Map a corpus-relative path to its citation (statute/26/121/a.rac -> 26/121/a)."""
+    citation = rel_path[:-len('.rac')] if rel_path.endswith('.rac') else rel_path
+    if citation.startswith('statute/'):
+        citation = citation[len('statute/'):]
+    return citation
+
+
+def parse_rac(content: str) -> dict:
+    """Extract status, definitions (with stub_for), imports and amend targets from .rac source.
+
+    `stub_for:` under a definition applies to that definition; a file-level
+    `stub_for:` applies to every definition that has none of its own.
+    """
+    status_match = STATUS_RE.search(content)
+    result = {
+        "status": status_match.group(1) if status_match else None,
+        "definitions": [],
+        "imports": [],
+        "amends": [],
+    }
+
+    in_docstring = False
+    imports_indent = None
+    file_stub_for = None
+    stub_fors = {}  # index into definitions -> stub_for
+    for lineno, line in enumerate(content.splitlines(), start=1):
+        # Skip statute text in """...""" blocks
+        quotes = line.count('"""')
+        if in_docstring:
+            if quotes % 2 == 1:
+                in_docstring = False
+            continue
+        if quotes % 2 == 1:
+            in_docstring = True
+            continue
+
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip())
+
+        if imports_indent is not None:
+            if indent > imports_indent and stripped.startswith('-'):
+                ref = IMPORT_REF_RE.search(stripped)
+                if ref:
+                    result["imports"].append(ref.groups())
+                continue
+            imports_indent = None
+
+        stub_for = STUB_FOR_RE.match(line)
+        if stub_for:
+            value = stub_for.group(2).strip().strip('"\'')
+            if not stub_for.group(1):
+                file_stub_for = value
+            elif result["definitions"]:
+                stub_fors[len(result["definitions"]) - 1] = value
+            continue
+
+        block = IMPORTS_BLOCK_RE.match(line)
+        if block:
+            if block.group(2):
+                result["imports"].extend(IMPORT_REF_RE.findall(block.group(2)))
+            else:
+                imports_indent = len(block.group(1))
+            continue
+
+        if indent == 0:
+            amend = AMEND_RE.match(line)
+            if amend:
+                result["amends"].append(amend.groups())
+                continue
+            definition = DEFINITION_RE.match(line)
+            if definition and definition.group(1) not in RESERVED_KEYS:
+                result["definitions"].append((definition.group(1), lineno))
+
+    result["definitions"] = [
+        (name, line, stub_fors.get(i, file_stub_for))
+        for i, (name, line) in enumerate(result["definitions"])
+    ]
+    result["imports"] = [
+        (citation, name, alias or None) for citation, name, alias in result["imports"]
+    ]
+    return result
+
+
+def index_file(conn: sqlite3.Connection, root: Path, file_path: Path) -> bool:
+    """(Re)index one .rac file from disk. Returns False if it is outside the corpus."""
+    rel_path = relative_to_root(root, file_path)
+    if rel_path is None:
+        return False
+
+    conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+    conn.execute("DELETE FROM definitions WHERE path = ?", (rel_path,))
+    conn.execute("DELETE FROM imports WHERE path = ?", (rel_path,))
+
+    try:
+        stat = file_path.stat()
+        content = file_path.read_text(encoding='utf-8', errors='replace')
+    except FileNotFoundError:
+        return True
+
+    parsed = parse_rac(content)
+    conn.execute("""
+        INSERT INTO files (path, citation, mtime_ns, size, status, indexed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        rel_path,
+        citation_for(rel_path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        parsed["status"],
+        datetime.utcnow().isoformat()
+    ))
+    conn.executemany(
+        "INSERT INTO definitions (path, name, line, stub_for) VALUES (?, ?, ?, ?)",
+        [(rel_path, name, line, stub_for) for name, line, stub_for in parsed["definitions"]]
+    )
+    conn.executemany(
+        "INSERT INTO imports (path, target_citation, target_name, alias) VALUES (?, ?, ?, ?)",
+        [(rel_path, citation, name, alias) for citation, name, alias in parsed["imports"]]
+    )
+    return True
+
+
+def iter_rac_files(root: Path):
+    """Yield every .rac file under root, skipping hidden directories."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            if filename.endswith('.rac'):
+                yield Path(dirpath) / filename
+
+
+def refresh(conn: sqlite3.Connection, root: Path = RAC_US_ROOT) -> dict:
+    """Re-index files whose mtime or size changed; drop files that disappeared."""
+    known = {
+        path: (mtime_ns, size)
+        for path, mtime_ns, size in conn.execute("SELECT path, mtime_ns, size FROM files")
+    }
+    stats = {"scanned": 0, "indexed": 0, "removed": 0}
+
+    for file_path in iter_rac_files(root):
+        rel_path = file_path.relative_to(root).as_posix()
+        stats["scanned"] += 1
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            continue
+        if known.pop(rel_path, None) != (stat.st_mtime_ns, stat.st_size):
+            index_file(conn, root, file_path)
+            stats["indexed"] += 1
+
+    for rel_path in known:
+        conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+        conn.execute("DELETE FROM definitions WHERE path = ?", (rel_path,))
+        conn.execute("DELETE FROM imports WHERE path = ?", (rel_path,))
+        stats["removed"] += 1
+
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_full_scan', ?)",
+        (datetime.utcnow().isoformat(),)
+    )
+    conn.commit()
+    return stats
+
+
+def rebuild(conn: sqlite3.Connection, root: Path = RAC_US_ROOT) -> dict:
+    """Discard the index and re-parse every file."""
+    clear_index(conn)
+    return refresh(conn, root)
+
+
+def resolve_file(conn: sqlite3.Connection, root: Path, ref: str) -> str:
+    """Accept a path (absolute or corpus-relative) or a citation; return the indexed path."""
+    candidate = Path(ref)
+    if candidate.is_absolute():
+        return relative_to_root(root, candidate) or ref
+    row = conn.execute(
+        "SELECT path FROM files WHERE path = ? OR citation = ?",
+        (ref, ref.split('#')[0].removesuffix('.rac'))
+    ).fetchone()
+    return row[0] if row else ref
+
+
+# ============================================
+# QUERIES
+# ============================================
+
+def find_definition(conn: sqlite3.Connection, name: str) -> list[dict]:
+    """Files that define `name`."""
+    cursor = conn.execute("""
+        SELECT d.path, f.citation, d.line, f.status
+        FROM definitions d JOIN files f ON f.path = d.path
+        WHERE d.name = ?
+        ORDER BY d.path
+    """, (name,))
+    return [dict(zip(("path", "citation", "line", "status"), row)) for row in cursor]
+
+
+def stub_files(conn: sqlite3.Connection, stub_for: str = None) -> list[dict]:
+    """Stub definitions, optionally filtered by their stub_for target.
+
+    `26 USC 1411` matches itself and `26 USC 1411(c)`, but not `26 USC 14111`.
+    """
+    query = """
+        SELECT d.path, f.citation, d.name, d.stub_for
+        FROM definitions d JOIN files f ON f.path = d.path
+        WHERE (f.status = 'stub' OR d.stub_for IS NOT NULL)
+    """
+    params = ()
+    if stub_for:
+        query += """
+            AND (d.stub_for = ?
+                 OR (substr(d.stub_for, 1, length(?)) = ?
+                     AND substr(d.stub_for, length(?) + 1, 1) = '('))
+        """
+        params = (stub_for,) * 4
+    cursor = conn.execute(query + " ORDER BY d.path, d.line", params)
+    return [dict(zip(("path", "citation", "name", "stub_for"), row)) for row in cursor]
+
+
+def file_imports(conn: sqlite3.Connection, path: str) -> list[dict]:
+    """Imports declared by one file."""
+    cursor = conn.execute("""
+        SELECT target_citation, target_name, alias
+        FROM imports WHERE path = ?
+        ORDER BY target_citation, target_name
+    """, (path,))
+    return [dict(zip(("citation", "name", "alias"), row)) for row in cursor]
+
+
+def importers(conn: sqlite3.Connection, target: str) -> list[dict]:
+    """Files importing from `citation` (or `citation#name`)."""
+    citation, _, name = target.partition('#')
+    query = "SELECT path, target_citation, target_name FROM imports WHERE target_citation = ?"
+    params = [citation]
+    if name:
+        query += " AND target_name = ?"
+        params.append(name)
+    cursor = conn.execute(query + " ORDER BY path", params)
+    return [dict(zip(("path", "citation", "name"), row)) for row in cursor]
+
+
+def blocking_stubs(conn: sqlite3.Connection, path: str) -> list[dict]:
+    """Stub definitions in files reachable through the (transitive) imports of `path`."""
+    cursor = conn.execute("""
+        WITH RECURSIVE deps(path) AS (
+            SELECT ?
+            UNION
+            SELECT f.path
+            FROM deps
+            JOIN imports i ON i.path = deps.path
+            JOIN files f ON f.citation = i.target_citation
+        )
+        SELECT d.path, f.citation, d.name, d.stub_for
+        FROM deps
+        JOIN files f ON f.path = deps.path
+        JOIN definitions d ON d.path = f.path
+        WHERE (f.status = 'stub' OR d.stub_for IS NOT NULL) AND f.path != ?
+        ORDER BY d.path, d.line
+    """, (path, path))
+    return [dict(zip(("path", "citation", "name", "stub_for"), row)) for row in cursor]
+
+
+def unresolved_imports(conn: sqlite3.Connection, path: str = None) -> list[dict]:
+    """Imports whose target file or definition is not in the index."""
+    query = """
+        SELECT i.path, i.target_citation, i.target_name,
+               CASE WHEN f.path IS NULL THEN 'missing_file' ELSE 'missing_definition' END
+        FROM imports i
+        LEFT JOIN files f ON f.citation = i.target_citation
+        LEFT JOIN definitions d ON d.path = f.path AND d.name = i.target_name
+        WHERE d.name IS NULL
+    """
+    params = ()
+    if path:
+        query += " AND i.path = ?"
+        params = (path,)
+    cursor = conn.execute(query + " ORDER BY i.path", params)
+    return [dict(zip(("path", "citation", "name", "reason"), row)) for row in cursor]
+
+
+# ============================================
+# HOOK + CLI
+# ============================================
+
+def run_hook():
+    """PostToolUse entry point: re-index the written/edited .rac file."""
+    try:
+        raw_input = sys.stdin.read()
+        hook_input = json.loads(raw_input) if raw_input else {}
+    except json.JSONDecodeError:
+        sys.exit(0)
+
+    if hook_input.get("tool_name") not in ("Write", "Edit"):
+        sys.exit(0)
+
+    file_path = hook_input.get("tool_input", {}).get("file_path", "")
+    # Edit only carries new_string, so always index from disk
+    if not file_path.endswith('.rac') or relative_to_root(RAC_US_ROOT, Path(file_path)) is None:
+        sys.exit(0)
+
+    try:
+        conn = connect()
+        if index_file(conn, RAC_US_ROOT, Path(file_path)):
+            conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Warning: Failed to update RAC index: {e}", file=sys.stderr)
+
+    sys.exit(0)
+
+
+def print_rows(rows: list[dict], as_json: bool):
+    """Print query results as JSON or tab-separated lines."""
+    if as_json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        print("\t".join("" if v is None else str(v) for v in row.values()))
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--root", type=Path, default=RAC_US_ROOT, help="rac-us checkout")
+    common.add_argument("--json", action="store_true", help="JSON output")
+    common.add_argument("--refresh", action="store_true", help="run mtime scan before querying")
+
+    parser = argparse.ArgumentParser(description="Query the rac-us symbol index")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("hook", help="PostToolUse entry point (hook input on stdin)")
+    sub.add_parser("rebuild", parents=[common], help="re-parse every .rac file")
+    update = sub.add_parser("update", parents=[common], help="re-index changed files (or the given ones)")
+    update.add_argument("files", nargs="*", type=Path)
+    defines = sub.add_parser("defines", parents=[common], help="files defining NAME")
+    defines.add_argument("name")
+    stubs = sub.add_parser("stubs", parents=[common], help="stub files")
+    stubs.add_argument("--for", dest="stub_for", help="filter by stub_for citation")
+    imports = sub.add_parser("imports", parents=[common], help="imports declared by FILE")
+    imports.add_argument("file")
+    importers_cmd = sub.add_parser("importers", parents=[common], help="files importing CITATION[#NAME]")
+    importers_cmd.add_argument("target")
+    blocking = sub.add_parser("blocking", parents=[common], help="stubs FILE transitively depends on")
+    blocking.add_argument("file")
+    unresolved = sub.add_parser("unresolved", parents=[common], help="imports with no matching definition")
+    unresolved.add_argument("file", nargs="?")
+
+    args = parser.parse_args()
+    if args.command == "hook":
+        run_hook()
+
+    root = args.root.expanduser()
+    conn = connect(root)
+
+    if args.command == "rebuild":
+        print_rows([rebuild(conn, root)], args.json)
+    elif args.command == "update":
+        if args.files:
+            indexed = sum(index_file(conn, root, f.expanduser().absolute()) for f in args.files)
+            conn.commit()
+            print_rows([{"indexed": indexed}], args.json)
+        else:
+            print_rows([refresh(conn, root)], args.json)
+    else:
+        # Scan on request, or if no full scan has ever completed (the hook
+        # alone only indexes the files it saw written)
+        scanned = conn.execute("SELECT 1 FROM meta WHERE key = 'last_full_scan'").fetchone()
+        if args.refresh or scanned is None:
+            refresh(conn, root)
+        if args.command == "defines":
+            rows = find_definition(conn, args.name)
+        elif args.command == "stubs":
+            rows = stub_files(conn, args.stub_for)
+        elif args.command == "imports":
+            rows = file_imports(conn, resolve_file(conn, root, args.file))
+        elif args.command == "importers":
+            rows = importers(conn, args.target)
+        elif args.command == "blocking":
+            rows = blocking_stubs(conn, resolve_file(conn, root, args.file))
+        else:
+            path = resolve_file(conn, root, args.file) if args.file else None
+            rows = unresolved_imports(conn, path)
+        print_rows(rows, args.json)
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()